@@ -1,53 +1,293 @@
 import os
-import subprocess
 import zipfile
 import sys
 import platform
 import shutil
+import stat
 import signal
-import glob
-import multiprocessing
 import urllib
-import urllib.request
 import urllib.parse
 import json
+import pickle
+import re
+import html
+import struct
+import ctypes
 import difflib
+import functools
+import itertools
+import bisect
 import time
-import pickle
 import random
-import threading
 import asyncio
+import threading
+import concurrent.futures
 from pathlib import Path
 from urllib.parse import unquote
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import aiohttp
-from bs4 import BeautifulSoup
 from PyQt5.QtWidgets import QApplication, QGridLayout, QGroupBox, QWidget, QVBoxLayout, \
-    QPushButton, QComboBox, QLineEdit, QListWidget, QLabel, QCheckBox, QTextEdit, \
+    QPushButton, QComboBox, QLineEdit, QListWidget, QLabel, QCheckBox, QPlainTextEdit, \
     QFileDialog, QDialog, QHBoxLayout, QAbstractItemView, QProgressBar, \
     QTabWidget
-from PyQt5.QtCore import QThread, pyqtSignal, QSettings, QEventLoop
-from PyQt5.QtGui import QTextCursor
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QThread, QProcess, pyqtSignal, QSettings, QEventLoop, QTimer
+
+try:
+    # Intel ISA-L's SIMD DEFLATE is a drop-in replacement for zlib in zipfile and unzips several times faster
+    from isal import isal_zlib
+    zipfile.zlib = isal_zlib
+except ImportError:
+    pass  # isal is optional, fall back to the stdlib zlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Not available on Windows, where reflinks aren't tried
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None  # Windows only, used to get the file handle for preallocating
+
+FICLONE = 0x40049409  # Linux ioctl that makes dst share src's blocks (Btrfs, XFS, bcachefs)
+
+# One pooled session for every requests call, so they reuse keep-alive connections to myrient
+# and retry the gateway errors it returns under load
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[502, 503, 504])))
+
+# Links to the zips in a Myrient directory listing, a regex over the raw bytes is much faster than building a parse tree
+HREF_RE = re.compile(rb'href="([^"]+\.zip)"')
+
+@functools.lru_cache(maxsize=32)
+def which(name):
+    # shutil.which stats every directory in PATH, only do that once per binary name
+    return shutil.which(name)
+
+@functools.lru_cache(maxsize=4)
+def ps3dec_supports_threads(binary):
+    # Redrrx's PS3Dec rewrite takes --iso/--dk/--tc and decrypts on several threads, the original PS3Dec
+    # only takes 'd key <key> <iso>' and uses one, so ask the binary once which one it is
+    process = QProcess()
+    process.setProcessChannelMode(QProcess.MergedChannels)
+    process.start(binary, ['--help'])
+    process.closeWriteChannel()  # A build that waits for Enter sees end of input instead of stalling the check
+    if not process.waitForFinished(5000):
+        process.kill()
+        process.waitForFinished()
+        return False
+    return b'--tc' in bytes(process.readAll())
+
+def move_file(src, dst):
+    # A plain rename is a single metadata operation when both paths are on the same filesystem,
+    # only fall back to copying when they are not
+    try:
+        os.replace(src, dst)
+        return
+    except OSError:
+        pass
+    if os.path.isdir(src):
+        shutil.move(src, dst)
+        return
+    with open(src, 'rb') as file_in, open(dst, 'wb') as file_out:
+        try:
+            # A reflink is still a metadata-only copy between subvolumes or bind mounts of a CoW filesystem
+            fcntl.ioctl(file_out.fileno(), FICLONE, file_in.fileno())
+        except (AttributeError, OSError):
+            # Otherwise copy inside the kernel with copy_file_range, or through userspace where that isn't supported
+            copy_range(file_in, file_out, 0, os.fstat(file_in.fileno()).st_size)
+    shutil.copystat(src, dst)
+    os.remove(src)
+
+def list_files(directory, prefix=''):
+    # One directory read and a plain string compare instead of glob's pattern matching,
+    # which also breaks on names containing [ or ]
+    with os.scandir(directory) as entries:
+        return [entry.path for entry in entries if entry.name.startswith(prefix) and entry.is_file()]
+
+def move_files(moves):
+    # Renames finish instantly, but moves across filesystems are full copies, so overlap a few of them
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda move: move_file(*move), moves))  # Re-raise the first error
+
+def copy_range(src, dst, offset, count):
+    # Copy count bytes from offset in src to dst, inside the kernel where the platform allows it
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while count > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), min(count, 1 << 30), offset)
+                if copied == 0:
+                    break
+                offset += copied
+                count -= copied
+            return
+        except OSError:
+            pass  # Not supported between these files, copy the rest through userspace
+    src.seek(offset)
+    while count > 0:
+        chunk = src.read(min(count, 1024 * 1024))
+        if not chunk:
+            break
+        dst.write(chunk)
+        count -= len(chunk)
+
+def split_file(file_path, part_path, keep_original, chunk_size=4294967295):
+    # Split file_path into chunk_size parts named part_path(0), part_path(1), ...
+    file_size = os.path.getsize(file_path)
+    num_parts = -(-file_size // chunk_size)
+    original_path = file_path
+    first_part = 0
+    if not keep_original:
+        # The original is deleted afterwards anyway, so rename it into the first part (no I/O),
+        # copy only the tail into the other parts and truncate the first part to size
+        os.replace(file_path, part_path(0))
+        file_path = part_path(0)
+        first_part = 1
+    with open(file_path, 'r+b' if not keep_original else 'rb') as f:
+        for i in range(first_part, num_parts):
+            with open(part_path(i), 'wb') as chunk_file:
+                copy_range(f, chunk_file, i * chunk_size, min(chunk_size, file_size - i * chunk_size))
+            print(f"Splitting {original_path}: part {i+1}/{num_parts} complete")
+        if not keep_original:
+            f.truncate(chunk_size)
+
+def write_at(fd, data, offset):
+    # pwrite takes the offset explicitly, Windows has no pwrite so seek there instead
+    data = memoryview(data)
+    if not hasattr(os, 'pwrite'):
+        os.lseek(fd, offset, os.SEEK_SET)
+    while data:
+        written = os.pwrite(fd, data, offset) if hasattr(os, 'pwrite') else os.write(fd, data)
+        data = data[written:]
+        offset += written
+
+def download_file(url, path):
+    # Download to a .part file and swap it in, so an interrupted download never leaves a truncated file behind
+    with SESSION.get(url, stream=True, timeout=(5, 30)) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True  # Still undo any Content-Encoding, like iter_content would
+        with open(path + '.part', 'wb') as file:
+            # Read straight from the urllib3 response in 1 MiB blocks, skipping iter_content's generator layers
+            shutil.copyfileobj(response.raw, file, 1024 * 1024)
+    os.replace(path + '.part', path)
+
+def format_speed(speed):
+    # Bytes per second as the label text
+    if speed > 1024 * 1024:
+        return f"{speed / (1024 * 1024):.2f} MB/s"
+    return f"{speed / 1024:.2f} KB/s"
+
+def format_eta(eta):
+    # Seconds left as the label text
+    if eta >= 60:
+        minutes, seconds = divmod(int(eta), 60)
+        return f"{minutes} minutes {seconds} seconds remaining"
+    return f"{eta:.2f} seconds remaining"
+
+def write_json_atomic(path, data):
+    # Write to a temporary file first and swap it in, so a crash mid-write can't corrupt the file
+    with open(path + '.tmp', 'w') as file:
+        json.dump(data, file, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+
+try:
+    MEMORY_SIZE = os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    MEMORY_SIZE = None  # Unknown (e.g. Windows), the page cache hints below are POSIX-only anyway
+
+def drop_cache(fd, length):
+    # Tell the kernel the first length bytes won't be read again soon, which starts writing them back
+    # and evicts them instead of letting a multi-GB download push everything else out of the page cache
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, length, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+def preallocate_file(fd, size):
+    # Ask the filesystem to reserve the full file size in one go so the file isn't fragmented, where supported.
+    # Linux, macOS and Windows can reserve the blocks without changing the file size, so a crash mid-download still
+    # leaves a file whose size is the resume offset
+    if size <= 0:
+        return
+    try:
+        if sys.platform.startswith('linux'):
+            libc = ctypes.CDLL(None, use_errno=True)
+            libc.fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+            if libc.fallocate(fd, 0x01, 0, size) == 0:  # FALLOC_FL_KEEP_SIZE
+                return
+        elif sys.platform == 'darwin':
+            # fstore_t for F_PREALLOCATE: try a contiguous allocation first, then any allocation
+            for flags in (0x02 | 0x04, 0x04):  # F_ALLOCATECONTIG | F_ALLOCATEALL, F_ALLOCATEALL
+                try:
+                    fcntl.fcntl(fd, 42, struct.pack('Iiqqq', flags, 3, 0, size, 0))  # F_PREALLOCATE, F_PEOFPOSMODE
+                    return
+                except OSError:
+                    pass
+            return
+        elif msvcrt is not None:
+            # FILE_ALLOCATION_INFO reserves the clusters without moving the end of the file either
+            kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+            kernel32.SetFileInformationByHandle.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_uint32]
+            allocation_size = ctypes.c_int64(size)
+            kernel32.SetFileInformationByHandle(msvcrt.get_osfhandle(fd), 5, ctypes.byref(allocation_size), ctypes.sizeof(allocation_size))  # FileAllocationInfo
+        elif hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(fd, 0, size)
+    except (OSError, AttributeError):
+        pass  # Not supported by this filesystem (e.g. FAT32), just grow the file as we write
 
 class GetSoftwareListThread(QThread):
     signal = pyqtSignal('PyQt_PyObject')
+    max_age = 6 * 60 * 60  # Seconds a revalidated listing is trusted without asking the server again
 
     def __init__(self, url, json_file):
         QThread.__init__(self)
         self.url = url
         self.json_file = json_file
+        self.refresh = False  # Fetch the listing even if the cached one can't be revalidated
 
     def run(self):
+        # The cache is {'etag', 'last_modified', 'checked', 'files'}, older versions stored just the list
         iso_list = []
+        validators = {}
+        checked = 0
         if os.path.exists(self.json_file):
-            with open(self.json_file, 'r') as file:
-                iso_list = json.load(file)
-        if not iso_list:
-            response = requests.get(self.url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            iso_list = [unquote(link.get('href')) for link in soup.find_all('a') if link.get('href').endswith('.zip')]
-            with open(self.json_file, 'w') as file:
-                json.dump(iso_list, file)
+            try:
+                with open(self.json_file, 'r') as file:
+                    cache = json.load(file)
+            except (ValueError, UnicodeDecodeError):
+                cache = []
+            if isinstance(cache, dict):
+                iso_list = cache.get('files', [])
+                if cache.get('etag'):
+                    validators['If-None-Match'] = cache['etag']
+                if cache.get('last_modified'):
+                    validators['If-Modified-Since'] = cache['last_modified']
+                checked = cache.get('checked', 0)
+            else:
+                iso_list = cache
+        if iso_list:
+            self.signal.emit(iso_list)  # Show the cached list straight away
+            if not self.refresh and (not validators or 0 <= time.time() - checked < self.max_age):
+                return  # Nothing to revalidate against, or checked recently enough, keep the cached list
+
+        # A 304 means the cached list is still current and skips downloading and parsing the listing
+        # Errors can't propagate out of run(), and an offline launch should still show the cached list
+        try:
+            response = SESSION.get(self.url, headers=validators, timeout=(5, 30))
+            if response.status_code not in (200, 304):
+                response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Could not fetch {self.url}: {e}")
+            return
+        if response.status_code == 304 and iso_list:
+            cache['checked'] = time.time()
+            write_json_atomic(self.json_file, cache)
+            return
+        iso_list = [unquote(html.unescape(href.decode())) for href in HREF_RE.findall(response.content)]
+        write_json_atomic(self.json_file, {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'), 'checked': time.time(), 'files': iso_list})
 
         self.signal.emit(iso_list)
 
@@ -65,28 +305,18 @@ class SplitPkgThread(QThread):
             self.status.emit(False)
             return
         else:
-            chunk_size = 4294967295
-            num_parts = -(-file_size // chunk_size)
-            with open(self.file_path, 'rb') as f:
-                i = 0
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-                    with open(f"{Path(self.file_path).stem}.pkg.666{str(i).zfill(2)}", 'wb') as chunk_file:
-                        chunk_file.write(chunk)
-                    print(f"Splitting {self.file_path}: part {i+1}/{num_parts} complete")
-                    i += 1
-            os.remove(self.file_path)
+            base = os.path.splitext(self.file_path)[0]
+            split_file(self.file_path, lambda i: f"{base}.pkg.666{str(i).zfill(2)}", keep_original=False)
             self.status.emit(True)
 
 class SplitIsoThread(QThread):
     progress = pyqtSignal(str)
     status = pyqtSignal(bool)
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, keep_original=True):
         QThread.__init__(self)
         self.file_path = file_path
+        self.keep_original = keep_original
 
     def run(self):
         file_size = os.path.getsize(self.file_path)
@@ -94,63 +324,95 @@ class SplitIsoThread(QThread):
             self.status.emit(False)
             return
         else:
-            chunk_size = 4294967295
-            num_parts = -(-file_size // chunk_size)
-            with open(self.file_path, 'rb') as f:
-                i = 0
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-                    with open(f"{os.path.splitext(self.file_path)[0]}.iso.{str(i)}", 'wb') as chunk_file:
-                        chunk_file.write(chunk)
-                    print(f"Splitting {self.file_path}: part {i+1}/{num_parts} complete")  
-                    i += 1
+            base = os.path.splitext(self.file_path)[0]
+            split_file(self.file_path, lambda i: f"{base}.iso.{str(i)}", keep_original=self.keep_original)
             self.status.emit(True)
 
 
-class OutputWindow(QTextEdit):
+class OutputWindow(QPlainTextEdit):
+    log_signal = pyqtSignal(str)
+
     def __init__(self, *args, **kwargs):
         super(OutputWindow, self).__init__(*args, **kwargs)
-        # sys.stdout = self
         self.setReadOnly(True)
+        self.setMaximumBlockCount(5000)  # Drop the oldest lines instead of growing forever
+
+        # Collect lines and append them together every 16 ms, so a burst of messages costs one layout pass
+        self.pending_lines = []
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(16)
+        self.flush_timer.timeout.connect(self.flush_lines)
+        self.log_signal.connect(self.queue_line)  # Queued when emitted from another thread
+
+    def log(self, text):
+        # Safe to call from any thread
+        self.log_signal.emit(text)
+
+    def queue_line(self, text):
+        self.pending_lines.append(text)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush_lines(self):
+        if self.pending_lines:
+            self.appendPlainText('\n'.join(self.pending_lines))
+            self.pending_lines = []
 
     def write(self, text):
-        cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        cursor.insertText(text)
-        self.setTextCursor(cursor)
-        QApplication.processEvents()
+        # appendPlainText adds its own newline, and skips the rich-text layout a QTextEdit would do
+        text = text.rstrip('\n')
+        if text:
+            self.log(text)
 
     def flush(self):
         pass
 
 # Function to run a command and check its success
-class CommandRunner(QThread):
-    def __init__(self, command):
+class CommandRunner(QProcess):
+    log_signal = pyqtSignal(str)
+    done = pyqtSignal()  # finished(int, QProcess::ExitStatus) can't be queued, wait_for_thread waits on this instead
+
+    def __init__(self, command, send_newline=False):
         super().__init__()
         self.command = command
-
-    def run(self):
-        process = subprocess.Popen(self.command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.PIPE, bufsize=1, universal_newlines=True)
-        
-        # If on Windows, send a newline character to ps3dec's standard input
-        if platform.system() == 'Windows':
-            process.stdin.write('\n')
-            process.stdin.flush()
-        
-        def reader_thread(process):
-            for line in iter(process.stdout.readline, ''):
-                print(line.rstrip('\n')) 
-                QApplication.processEvents()
-
-        thread = threading.Thread(target=reader_thread, args=(process,))
-        thread.start()
-        process.wait()
-        thread.join()
-
-        if process.returncode != 0:
-            raise subprocess.CalledProcessError(process.returncode, self.command)
+        self.send_newline = send_newline  # Redrrx's PS3Dec waits for Enter before exiting
+        self.buffer = b''
+
+        # Qt reads the pipe and signals when output arrives, no thread or polling needed
+        self.setProgram(command[0])
+        self.setArguments(command[1:])
+        self.setProcessChannelMode(QProcess.MergedChannels)
+        self.started.connect(self.on_started)
+        self.readyReadStandardOutput.connect(self.read_output)
+        self.finished.connect(self.on_finished)
+        self.errorOccurred.connect(self.on_error)
+
+    def on_error(self, error):
+        # finished is never emitted for a program that couldn't be started, signal done so waiters don't hang
+        if error == QProcess.FailedToStart:
+            self.log_signal.emit(f"Could not start {self.command[0]}")
+            self.done.emit()
+
+    def on_started(self):
+        # Send a newline to the standard input of programs that wait for one
+        if self.send_newline:
+            self.write(os.linesep.encode())
+
+    def read_output(self):
+        # Emit everything that arrived in one go rather than one signal per line, PS3Dec prints progress constantly
+        *lines, self.buffer = (self.buffer + bytes(self.readAllStandardOutput())).split(b'\n')
+        if lines:
+            self.log_signal.emit('\n'.join(line.decode(errors='replace').rstrip('\r') for line in lines))
+
+    def on_finished(self, exit_code, exit_status):
+        self.read_output()
+        if self.buffer:
+            self.log_signal.emit(self.buffer.decode(errors='replace').rstrip('\r'))
+            self.buffer = b''
+        if exit_status != QProcess.NormalExit or exit_code != 0:
+            self.log_signal.emit(f"Command {self.command} failed with exit code {exit_code}")
+        self.done.emit()
 
 class UnzipRunner(QThread):
     progress_signal = pyqtSignal(int)
@@ -168,22 +430,47 @@ class UnzipRunner(QThread):
             return
 
         with zipfile.ZipFile(self.zip_path, 'r') as zip_ref:
-            total_size = sum([info.file_size for info in zip_ref.infolist()])
-            extracted_size = 0
-
-            for info in zip_ref.infolist():
-                with zip_ref.open(info, 'r') as file_in:
-                    file_out_path = os.path.join(self.output_path, os.path.basename(info.filename)) 
-                    with open(file_out_path, 'wb') as file_out:
-                        while True:
-                            chunk = file_in.read(8192)
-                            if not chunk or not self.running:  # Stop reading if the runner is not running
-                                break
-                            file_out.write(chunk)
-                            extracted_size += len(chunk)
-                            self.progress_signal.emit(int((extracted_size / total_size) * 100))
-                            QApplication.processEvents()
-                    self.extracted_files.append(file_out_path)  # Store the path of the extracted file
+            # Directory entries have nothing to extract
+            infolist = [info for info in zip_ref.infolist() if not info.is_dir()]
+            self.total_size = sum([info.file_size for info in infolist])
+            self.extracted_size = 0
+            self.last_percent = -1
+            self.progress_lock = threading.Lock()
+
+            if len(infolist) == 1:
+                # Most zips hold a single ISO, there is nothing to spread over a thread pool
+                extracted_files = [self.extract_member(zip_ref, infolist[0])]
+            else:
+                # zlib and isal release the GIL while inflating, so members of multi-file zips (.bin/.cue sets,
+                # .pkg + .rap) are extracted on separate cores. The ZipFile serialises the raw reads internally
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(len(infolist), os.cpu_count() or 1))) as executor:
+                    extracted_files = list(executor.map(lambda info: self.extract_member(zip_ref, info), infolist))
+
+            self.extracted_files.extend(extracted_files)
+
+    def extract_member(self, zip_ref, info):
+        with zip_ref.open(info, 'r') as file_in:
+            file_out_path = os.path.join(self.output_path, os.path.basename(info.filename))
+            with open(file_out_path, 'wb') as file_out:
+                # Reserve the whole file up front so it is laid out contiguously on disk
+                preallocate_file(file_out.fileno(), info.file_size)
+                written = 0
+                while True:
+                    chunk = file_in.read(1024 * 1024)  # 1 MiB reads instead of 8 KiB, far fewer write() calls
+                    if not chunk or not self.running:  # Stop reading if the runner is not running
+                        break
+                    file_out.write(chunk)
+                    written += len(chunk)
+                    with self.progress_lock:
+                        self.extracted_size += len(chunk)
+                        # Only emit when the integer percentage actually changes
+                        percent = int((self.extracted_size / self.total_size) * 100)
+                        if percent != self.last_percent:
+                            self.last_percent = percent
+                            self.progress_signal.emit(percent)
+                if written != info.file_size:
+                    file_out.truncate(written)  # Don't leave a preallocated tail behind a cancelled extraction
+        return file_out_path  # The path of the extracted file
 
     def stop(self):
         self.running = False  # Add a method to stop the runner
@@ -193,30 +480,62 @@ class DownloadThread(QThread):
     speed_signal = pyqtSignal(str)
     eta_signal = pyqtSignal(str)
     download_complete_signal = pyqtSignal()
+    min_split_size = 16 * 1024 * 1024  # Smallest remaining range a finished connection will take half of
 
-    def __init__(self, url, filename, retries=50):  # Increase retries to 50
+    def __init__(self, url, filename, retries=8, resume_from=0, validator=None, connections=1):  # With the 30 second backoff cap that is a few minutes of retrying
         QThread.__init__(self)
         self.url = url
         self.filename = filename
         self.retries = retries
-        self.existing_file_size = 0
+        self.connections = connections  # Number of byte ranges fetched in parallel for a fresh download
+        self.existing_file_size = resume_from  # Bytes already on disk, the next request asks for the rest
+        self.validator = validator  # ETag or Last-Modified of the file the partial download came from
+        self.total_size = None
         self.start_time = None
         self.current_session_downloaded = 0
+        self.last_report = 0  # time.monotonic() of the last progress update
+        self.last_percent = -1
         self.running = True  # Add a flag to indicate whether the thread is running
 
-    async def download(self):
+    def create_session(self):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
         }
+        # Keep one session for every retry so the keep-alive connection is reused instead of redoing DNS + TCP + TLS,
+        # and time out stalled connects and reads so they trigger a retry instead of hanging forever
+        connector = aiohttp.TCPConnector(keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+        # Let the response buffer hold 1 MiB (default 64 KiB), otherwise read(1 MiB) rarely returns more than 64 KiB
+        return aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout, read_bufsize=1024 * 1024)
 
-        for i in range(self.retries):
-            try:
-                if os.path.exists(self.filename):
-                    self.existing_file_size = os.path.getsize(self.filename)
-                    headers['Range'] = f'bytes={self.existing_file_size}-'
-
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(self.url, headers=headers) as response:
+    async def download(self):
+        async with self.create_session() as session:
+            # Fetch the rest of the file over several connections, whatever is left afterwards is resumed over one
+            if self.connections > 1:
+                try:
+                    if await self.download_segments(session) or not self.running:
+                        return
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    print("Segmented download failed. Falling back to a single connection...")
+
+            for i in range(self.retries):
+                try:
+                    range_headers = {}
+                    if self.existing_file_size:
+                        range_headers = {'Range': f'bytes={self.existing_file_size}-'}
+                        if self.validator:
+                            # Only resume if the remote file is unchanged, otherwise the server sends the new file whole
+                            range_headers['If-Range'] = self.validator
+
+                    async with session.get(self.url, headers=range_headers) as response:
+                        if response.status == 416:  # Range Not Satisfiable, nothing past what we already have
+                            total_size = int(response.headers.get('content-range', '*/0').split('/')[-1])
+                            if total_size == self.existing_file_size:
+                                self.total_size = total_size
+                                self.progress_signal.emit(100)
+                                break
+                            self.existing_file_size = 0  # Not the file we have a part of, start over
+                            raise aiohttp.ClientPayloadError()
                         if response.status not in (200, 206):  # 200 = OK, 206 = Partial Content
                             raise aiohttp.ClientPayloadError()
 
@@ -224,56 +543,151 @@ class DownloadThread(QThread):
                             total_size = int(response.headers['content-range'].split('/')[-1])
                         else:
                             total_size = int(response.headers.get('content-length'))
-
-                        with open(self.filename, 'ab') as file:
-                            self.start_time = time.time()
+                        self.total_size = total_size
+
+                        # Weak ETags can't be used with If-Range, fall back to Last-Modified for those
+                        etag = response.headers.get('ETag')
+                        self.validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+
+                        # A 200 means the server ignored the Range header and is sending the whole file again
+                        if response.status != 206:
+                            self.existing_file_size = 0
+
+                        fd = os.open(self.filename, os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+                        try:
+                            preallocate_file(fd, total_size)
+                            # Only worth it when the file can't stay cached until it is unzipped anyway
+                            drop_behind = MEMORY_SIZE is not None and total_size > MEMORY_SIZE // 2
+                            dropped_up_to = self.existing_file_size
+                            self.start_time = time.monotonic()
                             while True:
-                                chunk = await response.content.read(8192)
-                                if not chunk:
+                                chunk = await response.content.read(1024 * 1024)  # Up to 1 MiB of whatever has arrived
+                                if not chunk or not self.running:  # Stop reading if the thread is not running
                                     break
-                                file.write(chunk)
+                                write_at(fd, chunk, self.existing_file_size)
                                 self.existing_file_size += len(chunk)
                                 self.current_session_downloaded += len(chunk)  # Update the current_session_downloaded
-                                self.progress_signal.emit(int((self.existing_file_size / total_size) * 100))  # Emit progress signal
-
-                                # Calculate speed and ETA
-                                elapsed_time = time.time() - self.start_time
-                                if elapsed_time > 0:
-                                    speed = self.current_session_downloaded / elapsed_time  # Calculate speed based on current session download
-                                else:
-                                    speed = 0
-                                remaining_bytes = total_size - self.existing_file_size
-                                eta = remaining_bytes / speed if speed > 0 else 0
-
-                                # Convert speed to appropriate units
-                                if speed > 1024**2:
-                                    speed_str = f"{speed / (1024**2):.2f} MB/s"
-                                else:
-                                    speed_str = f"{speed / 1024:.2f} KB/s"
-
-                                # Convert ETA to appropriate units
-                                if eta >= 60:
-                                    minutes, seconds = divmod(int(eta), 60)
-                                    eta_str = f"{minutes} minutes {seconds} seconds remaining"
-                                else:
-                                    eta_str = f"{eta:.2f} seconds remaining"
-
-                                # Emit the speed and ETA signals
-                                self.speed_signal.emit(speed_str)
-                                self.eta_signal.emit(eta_str)
-
-                # If the download was successful, break the loop
-                break
-            except aiohttp.ClientPayloadError:
-                print(f"Download interrupted. Retrying ({i+1}/{self.retries})...")
-                await asyncio.sleep(2 ** i + random.random())  # Exponential backoff
-                if i == self.retries - 1:  # If this was the last retry
-                    raise  # Re-raise the exception
-            except asyncio.TimeoutError:
-                print(f"Download interrupted. Retrying ({i+1}/{self.retries})...")
-                await asyncio.sleep(2 ** i + random.random())  # Exponential backoff
-                if i == self.retries - 1:  # If this was the last retry
-                    raise  # Re-raise the exception
+                                self.report_progress(self.existing_file_size, total_size)
+                                if drop_behind and self.existing_file_size - dropped_up_to >= 64 * 1024 * 1024:
+                                    drop_cache(fd, self.existing_file_size)
+                                    dropped_up_to = self.existing_file_size
+                        finally:
+                            # Trim the preallocated tail so the file size is always the resume offset
+                            os.ftruncate(fd, self.existing_file_size)
+                            os.close(fd)
+
+                    # If the download was successful, break the loop
+                    break
+                except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if i == self.retries - 1:  # If this was the last retry
+                        raise  # Re-raise the exception
+                    print(f"Download interrupted. Retrying ({i+1}/{self.retries})...")
+                    # Exponential backoff with full jitter, capped at 30 seconds so a dead server can't stall shutdown
+                    await asyncio.sleep(min(30, 2 ** min(i, 6)) * random.random())
+                    if not self.running:  # The user cancelled while we were waiting
+                        return
+
+    async def download_segments(self, session):
+        # Ask for the first missing byte to learn the size and whether the server supports ranges at all
+        offset = self.existing_file_size
+        range_headers = {'Range': f'bytes={offset}-{offset}'}
+        if offset and self.validator:
+            range_headers['If-Range'] = self.validator  # A 200 means the file changed, the single connection path restarts it
+        async with session.get(self.url, headers=range_headers) as response:
+            if response.status != 206 or 'content-range' not in response.headers:
+                return False
+            total_size = int(response.headers['content-range'].split('/')[-1])
+            etag = response.headers.get('ETag')
+            self.validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+        self.total_size = total_size
+
+        # Each segment is [start, bytes written up to, end]
+        segment_size = -(-(total_size - offset) // self.connections)
+        segments = [[start, start, min(start + segment_size, total_size)] for start in range(offset, total_size, segment_size)]
+
+        fd = os.open(self.filename, os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        tasks = [asyncio.ensure_future(self.download_segment(session, fd, segment, total_size, segments)) for segment in segments]
+        try:
+            preallocate_file(fd, total_size)
+            self.start_time = time.monotonic()
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+            # Keep only the contiguous downloaded prefix, so an interrupted download can be resumed from its size
+            self.existing_file_size = offset
+            for start, position, end in segments:
+                self.existing_file_size = position
+                if position < end:
+                    break
+            os.ftruncate(fd, self.existing_file_size)
+            os.close(fd)
+
+        if self.existing_file_size == total_size:
+            return True
+        if any(isinstance(result, Exception) for result in results):
+            print("Segmented download interrupted. Continuing with a single connection...")
+        return False
+
+    async def download_segment(self, session, fd, segment, total_size, segments):
+        # Once this connection's own range is done, take over half of the largest range still left,
+        # so a slow connection doesn't leave the others idle at the end
+        while segment is not None and self.running:
+            await self.download_range(session, fd, segment, total_size, segments)
+            segment = self.split_largest_segment(segments)
+
+    async def download_range(self, session, fd, segment, total_size, segments):
+        start, position, end = segment
+        range_headers = {'Range': f'bytes={position}-{end - 1}'}
+        if self.validator:
+            range_headers['If-Range'] = self.validator
+        async with session.get(self.url, headers=range_headers) as response:
+            if response.status != 206:  # The file changed or the server stopped honouring ranges
+                raise aiohttp.ClientPayloadError()
+            # segment[2] can shrink while this runs if another connection takes over the rest of the range
+            while self.running and segment[1] < segment[2]:
+                chunk = await response.content.read(1024 * 1024)
+                if not chunk:
+                    break
+                chunk = chunk[:segment[2] - segment[1]]  # Never write into the next segment
+                write_at(fd, chunk, segment[1])
+                segment[1] += len(chunk)
+                self.current_session_downloaded += len(chunk)
+                self.report_progress(total_size - sum(end - position for start, position, end in segments), total_size)
+
+    def split_largest_segment(self, segments):
+        largest = max(segments, key=lambda segment: segment[2] - segment[1])
+        remaining = largest[2] - largest[1]
+        if remaining < self.min_split_size:
+            return None  # Not worth another request
+        middle = largest[1] + remaining // 2
+        new_segment = [middle, middle, largest[2]]
+        largest[2] = middle
+        segments.insert(segments.index(largest) + 1, new_segment)  # Keep segments in file order
+        return new_segment
+
+    def report_progress(self, downloaded, total_size):
+        # Update the GUI at most 10 times a second, every signal is a queued call into the GUI thread
+        # and the speed and ETA labels can't be read any faster than that anyway
+        now = time.monotonic()
+        if downloaded < total_size and now - self.last_report < 0.1:
+            return
+        self.last_report = now
+
+        # The bar only shows whole percents, skip the signal when that hasn't changed
+        percent = int((downloaded / total_size) * 100)
+        if percent != self.last_percent:
+            self.last_percent = percent
+            self.progress_signal.emit(percent)  # Emit progress signal
+
+        # Speed is based on what this session downloaded, ETA on what is left of the whole file
+        elapsed_time = now - self.start_time
+        speed = self.current_session_downloaded / elapsed_time if elapsed_time > 0 else 0
+        eta = (total_size - downloaded) / speed if speed > 0 else 0
+        self.speed_signal.emit(format_speed(speed))
+        self.eta_signal.emit(format_eta(eta))
 
     def run(self):
         asyncio.run(self.download())
@@ -282,6 +696,174 @@ class DownloadThread(QThread):
     def stop(self):
         self.running = False  # Add a method to stop the thread
 
+class StreamUnzipThread(DownloadThread):
+    # Extracts a zip while it downloads by reading its local file headers in order, so the .zip never touches the disk.
+    # An interrupted transfer can't be resumed from the middle and starts over instead.
+
+    def __init__(self, url, output_path, retries=8):
+        super().__init__(url, None, retries=retries)
+        self.output_path = output_path
+        self.extracted_files = []
+        self.pending = b''  # Bytes read past the end of a member whose size is only known from its data descriptor
+        self.error = None  # Why the download or extraction failed, for the caller to report
+
+    def run(self):
+        # An exception escaping run() aborts the whole app, keep it for the caller instead
+        try:
+            asyncio.run(self.download())
+        except (zipfile.BadZipFile, aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            self.error = e
+            return
+        self.download_complete_signal.emit()
+
+    async def download(self):
+        async with self.create_session() as session:
+            for i in range(self.retries):
+                try:
+                    async with session.get(self.url) as response:
+                        if 400 <= response.status < 500:
+                            response.raise_for_status()  # Missing or forbidden (e.g. no dkey for this disc), retrying won't help
+                        if response.status != 200:
+                            raise aiohttp.ClientPayloadError(f"Server returned HTTP {response.status}")
+                        self.total_size = int(response.headers.get('content-length', 0)) or None
+                        self.current_session_downloaded = 0
+                        self.extracted_files = []
+                        self.pending = b''
+                        self.start_time = time.monotonic()
+                        await self.extract_stream(response.content)
+
+                    # If the download was successful, break the loop
+                    break
+                except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if i == self.retries - 1:  # If this was the last retry
+                        raise  # Re-raise the exception
+                    print(f"Download interrupted. Restarting ({i+1}/{self.retries})...")
+                    # Exponential backoff with full jitter, capped at 30 seconds so a dead server can't stall shutdown
+                    await asyncio.sleep(min(30, 2 ** min(i, 6)) * random.random())
+                    if not self.running:  # The user cancelled while we were waiting
+                        return
+
+    async def read_some(self, stream, size):
+        if self.pending:
+            chunk, self.pending = self.pending[:size], self.pending[size:]
+            return chunk
+        chunk = await stream.read(size)
+        self.current_session_downloaded += len(chunk)
+        if self.total_size:
+            self.report_progress(self.current_session_downloaded, self.total_size)
+        return chunk
+
+    async def read_exactly(self, stream, size):
+        data = b''
+        while len(data) < size:
+            chunk = await self.read_some(stream, size - len(data))
+            if not chunk:
+                raise aiohttp.ClientPayloadError("Response payload is not completed")
+            data += chunk
+        return data
+
+    async def extract_stream(self, stream):
+        # zipfile.zlib is isal's zlib when that is installed
+        zlib = zipfile.zlib
+        while self.running:
+            if await self.read_exactly(stream, 4) != b'PK\x03\x04':
+                break  # Reached the central directory, every member has been extracted
+
+            flags, method, crc, compressed_size, file_size, name_length, extra_length = \
+                struct.unpack('<2xHH4xIIIHH', await self.read_exactly(stream, 26))
+            name = (await self.read_exactly(stream, name_length)).decode('utf-8' if flags & 0x800 else 'cp437')
+            extra = await self.read_exactly(stream, extra_length)
+
+            # Zip64 sizes live in the extra field when the header ones are maxed out
+            zip64 = False
+            while len(extra) >= 4:
+                header_id, data_size = struct.unpack('<HH', extra[:4])
+                if header_id == 0x0001:
+                    zip64 = True
+                    values = list(struct.unpack(f'<{data_size // 8}Q', extra[4:4 + data_size // 8 * 8]))
+                    if file_size == 0xFFFFFFFF and values:
+                        file_size = values.pop(0)
+                    if compressed_size == 0xFFFFFFFF and values:
+                        compressed_size = values.pop(0)
+                extra = extra[4 + data_size:]
+
+            has_descriptor = flags & 0x08
+            if flags & 0x01 or method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) or (has_descriptor and method == zipfile.ZIP_STORED):
+                raise zipfile.BadZipFile(f"{name} can't be extracted while downloading, disable unzipping while downloading in the settings")
+
+            # Directory entries carry no data worth keeping. Members are written to a .part file and only get
+            # their real name once their CRC checks out, so an interrupted download never leaves a truncated file
+            file_out_path = os.path.join(self.output_path, os.path.basename(name)) if not name.endswith('/') else os.devnull
+            part_path = file_out_path + '.part' if file_out_path != os.devnull else os.devnull
+            decompressor = zlib.decompressobj(-15) if method == zipfile.ZIP_DEFLATED else None
+            crc_value = 0
+            remaining = None if has_descriptor else compressed_size
+            completed = False
+            try:
+                with open(part_path, 'wb') as file_out:
+                    # Like UnzipRunner, reserve the whole file up front when the header gives its size
+                    if not has_descriptor and part_path != os.devnull:
+                        preallocate_file(file_out.fileno(), file_size)
+                    while remaining is None or remaining > 0:
+                        chunk = await self.read_some(stream, 1024 * 1024 if remaining is None else min(remaining, 1024 * 1024))
+                        if not chunk:
+                            raise aiohttp.ClientPayloadError("Response payload is not completed")
+                        if remaining is not None:
+                            remaining -= len(chunk)
+                        # Inflate at most 1 MiB at a time like zipfile does, a chunk of zero padding would otherwise
+                        # inflate to about a GiB in one call
+                        while True:
+                            data = decompressor.decompress(chunk, 1024 * 1024) if decompressor else chunk
+                            chunk = decompressor.unconsumed_tail if decompressor else b''
+                            file_out.write(data)
+                            crc_value = zlib.crc32(data, crc_value)
+                            # A full block with no input left may still have output pending inside zlib, so go round once more
+                            if not decompressor or decompressor.eof or (not chunk and len(data) < 1024 * 1024):
+                                break
+                        if decompressor and decompressor.eof:
+                            self.pending = decompressor.unused_data + self.pending
+                            break
+                        if not self.running:
+                            return
+
+                if has_descriptor:
+                    descriptor = await self.read_exactly(stream, 4)
+                    if descriptor == b'PK\x07\x08':  # The signature is optional
+                        descriptor = await self.read_exactly(stream, 4)
+                    crc = struct.unpack('<I', descriptor)[0]
+                    await self.read_exactly(stream, 16 if zip64 else 8)  # Compressed and uncompressed sizes
+
+                if crc_value != crc:
+                    raise zipfile.BadZipFile(f"Bad CRC-32 for file {name}")
+                if part_path != os.devnull:
+                    os.replace(part_path, file_out_path)
+                    self.extracted_files.append(file_out_path)
+                completed = True
+            finally:
+                if not completed and part_path != os.devnull and os.path.exists(part_path):
+                    os.remove(part_path)
+
+class WorkerSignals(QObject):
+    finished = pyqtSignal()
+
+class Worker(QRunnable):
+    # Runs a plain function on the global thread pool, for blocking file work that has no thread class of its own
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.exception = None
+        self.signals = WorkerSignals()
+        self.setAutoDelete(False)  # The caller keeps it alive until it has read the result
+
+    def run(self):
+        try:
+            self.fn(*self.args)
+        except Exception as e:
+            self.exception = e  # Re-raised on the GUI thread by run_in_pool
+        finally:
+            self.signals.finished.emit()
+
 class GUIDownloader(QWidget):
     def __init__(self):
         super().__init__()
@@ -312,7 +894,12 @@ class GUIDownloader(QWidget):
             self.settings.setValue('ps3dec_binary', '')
 
         # Check if ps3dec is in the user's PATH
-        ps3dec_in_path = shutil.which("ps3dec") or shutil.which("PS3Dec") or shutil.which("ps3dec.exe") or shutil.which("PS3Dec.exe")
+        # Filenames are case-insensitive on Windows and macOS, so only look for the capitalised names elsewhere
+        if platform.system() in ('Windows', 'Darwin'):
+            ps3dec_names = ('ps3dec', 'ps3dec.exe')
+        else:
+            ps3dec_names = ('ps3dec', 'PS3Dec', 'ps3dec.exe', 'PS3Dec.exe')
+        ps3dec_in_path = next(filter(None, (which(name) for name in ps3dec_names)), None)
 
         if ps3dec_in_path:
             self.ps3dec_binary = ps3dec_in_path
@@ -330,40 +917,71 @@ class GUIDownloader(QWidget):
         self.ps2iso_thread = self.load_software_list(self.ps2iso_list, "https://myrient.erista.me/files/Redump/Sony%20-%20PlayStation%202/", 'ps2isolist.json', self.set_ps2iso_list)
         self.psxiso_thread = self.load_software_list(self.psxiso_list, "https://myrient.erista.me/files/Redump/Sony%20-%20PlayStation/", 'psxlist.json', self.set_psxiso_list)
         self.pspiso_thread = self.load_software_list(self.pspiso_list, "https://myrient.erista.me/files/Redump/Sony%20-%20PlayStation%20Portable/", 'psplist.json', self.set_pspiso_list)
-        self.ps3iso_thread.start()
-        self.psn_thread.start()
-        self.ps2iso_thread.start()
-        self.psxiso_thread.start()
-        self.pspiso_thread.start()
 
         # For displaying queue position in OutputWindow
         self.processed_items = 0 
         self.total_items = 0 
 
         # Load the queue from 'queue.txt'
+        self.queue = []
         if os.path.exists('queue.txt'):
-            with open('queue.txt', 'rb') as file:
-                self.queue = pickle.load(file)
-        else:
-            self.queue = []
+            try:
+                with open('queue.txt', 'rb') as file:
+                    pickled = file.peek(1)[:1] == b'\x80'
+                    self.queue = pickle.load(file) if pickled else json.load(file)
+                if pickled:
+                    # Older versions pickled the queue, convert it to JSON once
+                    write_json_atomic('queue.txt', self.queue)
+            except (ValueError, UnicodeDecodeError, pickle.UnpicklingError, EOFError):
+                print("Could not read queue.txt, starting with an empty queue.")
+
+        # Load the remote size and ETag/Last-Modified recorded for each downloaded zip, dropping zips that are gone
+        self.download_info = {}
+        if os.path.exists('downloads.json'):
+            try:
+                with open('downloads.json', 'r') as file:
+                    self.download_info = {path: info for path, info in json.load(file).items() if os.path.exists(path)}
+            except (ValueError, UnicodeDecodeError, AttributeError):
+                print("Could not read downloads.json, partial downloads will be resumed without validation.")
+
+        # Track unsaved queue changes and coalesce bursts of them into a single save
+        self.queue_dirty = False
+        self.queue_save_timer = QTimer(self)
+        self.queue_save_timer.setSingleShot(True)
+        self.queue_save_timer.setInterval(500)
+        self.queue_save_timer.timeout.connect(self.save_queue)
+
+        # The threads currently downloading and unzipping, so they can be stopped on exit
+        self.download_thread = None
+        self.unzip_runner = None
+        self.dkey_thread = None
 
         self.initUI()
 
         # Add the entries from 'queue.txt' to the queue
-        for item in self.queue:
-            self.queue_list.addItem(item)
+        self.queue_list.addItems(self.queue)
+
+        # Save the queue shortly after any change to it, whether it's from the buttons or a finished download
+        queue_model = self.queue_list.model()
+        queue_model.rowsInserted.connect(self.mark_queue_dirty)
+        queue_model.rowsRemoved.connect(self.mark_queue_dirty)
+        queue_model.rowsMoved.connect(self.mark_queue_dirty)
 
         # Add a signal handler for SIGINT to stop the download and save the queue
         signal.signal(signal.SIGINT, self.closeEvent)
 
     def closeEvent(self, event):
         # Stop the UnzipRunner and DownloadThread
-        self.download_thread.stop()
-        self.unzip_runner.stop()
+        if self.download_thread:
+            self.download_thread.stop()
+        if self.unzip_runner:
+            self.unzip_runner.stop()
+        if self.dkey_thread:
+            self.dkey_thread.stop()
 
-        # Save the queue to 'queue.txt'
-        with open('queue.txt', 'wb') as file:
-            pickle.dump([self.queue_list.item(i).text() for i in range(self.queue_list.count())], file)
+        # Save the queue to 'queue.txt' if it changed since it was last written
+        if self.queue_dirty:
+            self.save_queue()
 
         event.accept()  # Accept the close event
 
@@ -378,9 +996,15 @@ class GUIDownloader(QWidget):
         # Create a search box
         self.search_box = QLineEdit(self)
         self.search_box.setPlaceholderText('Search...')
-        self.search_box.textChanged.connect(self.update_results)
         vbox.addWidget(self.search_box)
 
+        # Filter once typing pauses for 100 ms instead of on every keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(100)
+        self.search_timer.timeout.connect(self.update_results)
+        self.search_box.textChanged.connect(self.search_timer.start)
+
         # Create a list for results (software list)
         self.result_list = QTabWidget(self)
         self.result_list.addTab(QListWidget(), "PS3 ISOs")
@@ -388,12 +1012,17 @@ class GUIDownloader(QWidget):
         self.result_list.addTab(QListWidget(), "PS2 ISOs")
         self.result_list.addTab(QListWidget(), "PSX ISOs")  # New tab
         self.result_list.addTab(QListWidget(), "PSP ISOs")  # New tab
-        self.result_list.widget(0).addItems(self.ps3iso_list)
-        self.result_list.widget(1).addItems(self.psn_list)
-        self.result_list.widget(2).addItems(self.ps2iso_list)
-        self.result_list.widget(3).addItems(self.psxiso_list)  # New list
-        self.result_list.widget(4).addItems(self.pspiso_list)  # New list
+        for index in range(self.result_list.count()):
+            # Every row is one line of text, this lets the view lay out 10k+ rows without measuring each one
+            self.result_list.widget(index).setUniformItemSizes(True)
+        self.search_index = {}
+        self.hidden_rows = {}
+        self.search_terms = {}  # The words each tab was last filtered with
+        self.search_blobs = {}  # Each tab's lowercased names joined by newlines, and the offset each row starts at
+        for index, software_list in enumerate((self.ps3iso_list, self.psn_list, self.ps2iso_list, self.psxiso_list, self.pspiso_list)):
+            self.populate_list_widget(index, software_list)
         self.result_list.currentChanged.connect(self.update_add_to_queue_button)
+        self.result_list.currentChanged.connect(self.update_results)  # Apply the search to the newly shown tab
         vbox.addWidget(self.result_list)
 
         # Connect the itemSelectionChanged signal to the update_add_to_queue_button method
@@ -575,6 +1204,10 @@ class GUIDownloader(QWidget):
             else:  # New condition for PSP ISOs
                 file_paths = self.downloadpspisozip(item_text, f"{self.processed_items}/{self.total_items}")
 
+            # Stop at a failed or stopped item, leaving it at the top of the queue so it is saved and can be retried
+            if file_paths is False:
+                break
+
             # Remove the first item from the queue list
             self.queue_list.takeItem(0)
 
@@ -582,8 +1215,7 @@ class GUIDownloader(QWidget):
         self.total_items = 0
 
         # Save the queue to 'queue.txt'
-        with open('queue.txt', 'wb') as file:
-            pickle.dump([self.queue_list.item(i).text() for i in range(self.queue_list.count())], file)
+        self.save_queue()
 
         # Re-enable the buttons
         self.settings_button.setEnabled(True)
@@ -604,50 +1236,44 @@ class GUIDownloader(QWidget):
     def downloadhelper(self, selected_iso, queue_position, url):
         # URL-encode the selected_iso
         selected_iso_encoded = urllib.parse.quote(selected_iso)
-        
-        # Load the user's settings
-        settings = QSettings('./myrientDownloaderGUI.ini', QSettings.IniFormat)
-        ps3dec_binary = settings.value('ps3dec_binary', '')
 
         # Compute base_name from selected_iso
         base_name = os.path.splitext(selected_iso)[0]
 
-        # Define the file paths for .iso and .pkg files
-        iso_file_path = os.path.join(self.processing_dir, base_name + '.iso')
-        pkg_file_path = os.path.join(self.processing_dir, base_name + '.pkg')
-
-        # Check if the .iso or .pkg file already exists
-        if os.path.exists(iso_file_path) or os.path.exists(pkg_file_path):
-            print(f"File {iso_file_path} or {pkg_file_path} already exists. Skipping download.")
-            return iso_file_path if os.path.exists(iso_file_path) else pkg_file_path
-
         # Define the path for the .zip file
         zip_file_path = os.path.join(self.processing_dir, base_name + '.zip')
 
-        # If the .zip file exists, compare its size to that of the remote URL
+        # If the .zip file exists, compare its size to the one recorded when it was downloaded.
+        # No request is needed to skip a finished file, and a partial one is resumed with If-Range,
+        # which makes the server send the whole file instead if it changed since
+        resume_from = 0
+        validator = None
+        remote_file_size = None
         if os.path.exists(zip_file_path):
             local_file_size = os.path.getsize(zip_file_path)
+            download_info = self.download_info.get(zip_file_path, {})
+            remote_file_size = download_info.get('size')
 
-            # Get the size of the remote file
-            response = requests.head(f"{url}/{selected_iso_encoded}")
-            if 'content-length' in response.headers:
-                remote_file_size = int(response.headers['content-length'])
-            else:
-                print("Could not get the size of the remote file.")
-                return zip_file_path
-
-            # If the local file is smaller, attempt to resume the download
-            if local_file_size < remote_file_size:
-                print(f"Local file is smaller than the remote file. Attempting to resume download...")
             # If the local file is the same size as the remote file, skip the download
-            elif local_file_size == remote_file_size:
+            if local_file_size == remote_file_size:
                 print(f"Local file is the same size as the remote file. Skipping download...")
                 return zip_file_path
+            # If the local file is larger it can't be a partial download of this file, so start over
+            elif remote_file_size is not None and local_file_size > remote_file_size:
+                print("Local file is larger than the remote file. Restarting download...")
+            # Otherwise resume the download from where it stopped
+            else:
+                print(f"Resuming download at {local_file_size} bytes...")
+                resume_from = local_file_size
+                validator = download_info.get('validator')
 
         # If the file does not exist, proceed with the download
-        self.output_window.append(f"({queue_position}) Download started for {base_name}...")
+        self.output_window.log(f"({queue_position}) Download started for {base_name}...")
         self.progress_bar.reset()  # Reset the progress bar to 0
-        self.download_thread = DownloadThread(f"{url}/{selected_iso_encoded}", zip_file_path)
+        if resume_from and remote_file_size:
+            self.progress_bar.setValue(int((resume_from / remote_file_size) * 100))  # Start from the resumed fraction
+        connections = 4 if self.settings.value('segmented_downloads', False, type=bool) else 1
+        self.download_thread = DownloadThread(f"{url}/{selected_iso_encoded}", zip_file_path, resume_from=resume_from, validator=validator, connections=connections)
         self.download_thread.progress_signal.connect(self.progress_bar.setValue)
         self.download_thread.speed_signal.connect(self.download_speed_label.setText)
         self.download_thread.eta_signal.connect(self.download_eta_label.setText)
@@ -660,296 +1286,300 @@ class GUIDownloader(QWidget):
         self.download_thread.start()
         loop.exec_()
 
+        # Remember the size and validator of the remote file so the next run can skip or resume without asking first
+        if self.download_thread.total_size is not None:
+            self.download_info[zip_file_path] = {'size': self.download_thread.total_size, 'validator': self.download_thread.validator}
+            write_json_atomic('downloads.json', self.download_info)
+
         return zip_file_path
 
+    def wait_for_thread(self, thread):
+        # Run a nested event loop until the thread (or CommandRunner process) finishes, so the window keeps repainting
+        # in the meantime. Queued, so a process that fails inside start() can't quit the loop before it runs
+        loop = QEventLoop()
+        finished = thread.done if isinstance(thread, CommandRunner) else thread.finished
+        finished.connect(loop.quit, Qt.QueuedConnection)
+        thread.start()
+        loop.exec_()
 
-    def downloadps3isozip(self, selected_iso, queue_position):
-        url = "https://dl10.myrient.erista.me/files/Redump/Sony - PlayStation 3"
+    def run_in_pool(self, fn, *args):
+        # Run fn on the thread pool and wait for it like wait_for_thread, so large moves don't freeze the window
+        worker = Worker(fn, *args)
+        loop = QEventLoop()
+        worker.signals.finished.connect(loop.quit, Qt.QueuedConnection)
+        QThreadPool.globalInstance().start(worker)
+        loop.exec_()
+        if worker.exception:
+            raise worker.exception
+
+    def download_and_unzip(self, selected_iso, queue_position, url):
         base_name = os.path.splitext(selected_iso)[0]
+
+        # Define the file paths for .iso and .pkg files
+        iso_file_path = os.path.join(self.processing_dir, base_name + '.iso')
+        pkg_file_path = os.path.join(self.processing_dir, base_name + '.pkg')
+
+        # Check if the .iso or .pkg file already exists
+        if os.path.exists(iso_file_path) or os.path.exists(pkg_file_path):
+            print(f"File {iso_file_path} or {pkg_file_path} already exists. Skipping download.")
+            return [iso_file_path if os.path.exists(iso_file_path) else pkg_file_path]
+
+        # Unzip while downloading unless there's a partial .zip to resume
+        zip_file_path = os.path.join(self.processing_dir, base_name + '.zip')
+        if self.settings.value('stream_unzip', False, type=bool) and not os.path.exists(zip_file_path):
+            self.output_window.log(f"({queue_position}) Downloading and unzipping {base_name}...")
+            self.progress_bar.reset()  # Reset the progress bar to 0
+            self.download_thread = StreamUnzipThread(f"{url}/{urllib.parse.quote(selected_iso)}", self.processing_dir)
+            self.download_thread.progress_signal.connect(self.progress_bar.setValue)
+            self.download_thread.speed_signal.connect(self.download_speed_label.setText)
+            self.download_thread.eta_signal.connect(self.download_eta_label.setText)
+
+            # Create a QEventLoop
+            loop = QEventLoop()
+            self.download_thread.finished.connect(loop.quit)
+
+            # Start the thread and the event loop
+            self.download_thread.start()
+            loop.exec_()
+
+            # Don't hand on the members of a failed or stopped download, the item can't be finished
+            if self.download_thread.error:
+                error = self.download_thread.error
+                self.output_window.log(f"({queue_position}) Could not download {base_name}: {str(error) or type(error).__name__}")
+                return None
+            if not self.download_thread.running:
+                return None
+            return self.download_thread.extracted_files
+
         file_path = self.downloadhelper(selected_iso, queue_position, url)
 
-        self.output_window.append(f"({queue_position}) Unzipping {base_name}.zip...")
+        self.output_window.log(f"({queue_position}) Unzipping {base_name}.zip...")
 
         # Unzip the ISO and delete the ZIP file
-        runner = UnzipRunner(file_path, self.processing_dir)
-        runner.progress_signal.connect(self.progress_bar.setValue)
-        runner.start()
+        self.unzip_runner = UnzipRunner(file_path, self.processing_dir)
+        self.unzip_runner.progress_signal.connect(self.progress_bar.setValue)
         loop = QEventLoop()
-        runner.finished.connect(loop.quit)
+        self.unzip_runner.finished.connect(loop.quit)
+        self.unzip_runner.start()
         loop.exec_()
 
         os.remove(file_path)
 
+        return self.unzip_runner.extracted_files
+
+    def downloadps3isozip(self, selected_iso, queue_position):
+        url = "https://dl10.myrient.erista.me/files/Redump/Sony - PlayStation 3"
+        base_name = os.path.splitext(selected_iso)[0]
+
+        # The paths this item goes through, built once
+        iso_path = os.path.join(self.processing_dir, f"{base_name}.iso")
+        enc_path = os.path.join(self.processing_dir, f"{base_name}.iso.enc")
+        dkey_path = os.path.join(self.processing_dir, f"{base_name}.dkey")
+
         # Check if the corresponding dkey file already exists
-        if not os.path.isfile(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.dkey")):
+        self.dkey_thread = None
+        if not os.path.isfile(dkey_path):
             if self.decrypt_checkbox.isChecked() or self.keep_dkey_checkbox.isChecked():
-                # Download the corresponding dkey file
-                self.output_window.append(f"({queue_position}) Getting dkey for {base_name}...")
-                self.progress_bar.reset()  # Reset the progress bar to 0
-                self.download_thread = DownloadThread(f"https://dl10.myrient.erista.me/files/Redump/Sony - PlayStation 3 - Disc Keys TXT/{os.path.splitext(selected_iso)[0]}.zip", os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.zip"))
-                self.download_thread.progress_signal.connect(self.progress_bar.setValue)
-
-                # Create a QEventLoop
-                loop = QEventLoop()
-                self.download_thread.finished.connect(loop.quit)
-
-                # Start the thread and the event loop
-                self.download_thread.start()
+                # Download the corresponding dkey file alongside the ISO, so it's ready by the time the ISO is.
+                # The dkey zip is tiny, so unzip it straight from the response instead of saving it first
+                self.output_window.log(f"({queue_position}) Getting dkey for {base_name}...")
+                self.dkey_thread = StreamUnzipThread(f"https://dl10.myrient.erista.me/files/Redump/Sony - PlayStation 3 - Disc Keys TXT/{urllib.parse.quote(base_name)}.zip", self.processing_dir)
+                self.dkey_thread.start()
+
+        # A run interrupted during decryption leaves only the .iso.enc behind, move it back so it is reused, not downloaded again
+        if os.path.isfile(enc_path) and not os.path.isfile(iso_path):
+            os.replace(enc_path, iso_path)
+
+        if self.download_and_unzip(selected_iso, queue_position, url) is None:
+            return False  # The download failed or was stopped, start_download keeps the item queued
+
+        if self.dkey_thread:
+            # Wait for the dkey if it is somehow still downloading. The connection is made before checking,
+            # so a thread that finishes in between still quits the loop
+            loop = QEventLoop()
+            self.dkey_thread.finished.connect(loop.quit, Qt.QueuedConnection)
+            if not self.dkey_thread.isFinished():
                 loop.exec_()
-                    
-                # Unzip the dkey file and delete the ZIP file
-                with zipfile.ZipFile(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.zip"), 'r') as zip_ref:
-                    zip_ref.extractall(self.processing_dir)
-                os.remove(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.zip"))
 
-        # Run the PS3Dec command if decryption is enabled
+            if not os.path.isfile(dkey_path):
+                self.output_window.log(f"({queue_position}) Could not get the dkey for {base_name}.")
+
+        # Read the first 32 characters of the .dkey file if decryption is enabled
+        key = None
         if self.decrypt_checkbox.isChecked():
-        # Read the first 32 characters of the .dkey file
-            if os.path.isfile(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.dkey")):
-                with open(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.dkey"), 'r') as file:
-                    key = file.read(32)
-            self.output_window.append(f"({queue_position}) Decrypting ISO for {base_name}...")
-            if platform.system() == 'Windows':
-                thread_count = multiprocessing.cpu_count() // 2
-                command = [f"{self.ps3dec_binary}", "--iso", os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso"), "--dk", key, "--tc", str(thread_count)]
+            try:
+                key = Path(dkey_path).read_bytes()[:32]
+            except OSError:
+                key = b''
+            # A disc key is 32 hex digits, catch a truncated or corrupt dkey here instead of after a failed decrypt
+            if len(key) == 32 and not key.translate(None, b'0123456789abcdefABCDEF'):
+                key = key.decode('ascii')
             else:
-                command = [self.ps3dec_binary, 'd', 'key', key, os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso")]
-
-            runner = CommandRunner(command)
-            runner.start()
-            runner.wait()  # Wait for the command to complete
-
-            # Rename the original ISO file to .iso.enc
-            os.rename(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso"), os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso.enc"))
-
-            # Check the platform and rename the decrypted file accordingly
-            if platform.system() == 'Windows':
-                os.rename(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso_decrypted.iso"), os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso"))
+                key = None
+                self.output_window.log(f"({queue_position}) No usable dkey for {base_name}, skipping decryption.")
+
+        # Run the PS3Dec command if there is a key to decrypt with
+        if key:
+            self.output_window.log(f"({queue_position}) Decrypting ISO for {base_name}...")
+            # The Windows build is always the multithreaded PS3Dec, elsewhere it can be either
+            threaded = platform.system() == 'Windows' or ps3dec_supports_threads(self.ps3dec_binary)
+            if threaded:
+                # Leave one core for the GUI and the next download, instead of half of them idle
+                thread_count = max(1, (os.cpu_count() or 1) - 1)
+                command = [f"{self.ps3dec_binary}", "--iso", iso_path, "--dk", key, "--tc", str(thread_count)]
             else:
-                os.rename(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso.dec"), os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso"))
-
-            # Delete the .iso.enc if the checkbox is unchecked
-            if not self.keep_enc_checkbox.isChecked():
-                os.remove(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso.enc"))
+                command = [self.ps3dec_binary, 'd', 'key', key, iso_path]
+
+            runner = CommandRunner(command, send_newline=threaded)
+            runner.log_signal.connect(print)
+            self.wait_for_thread(runner)  # Wait for the command to complete
+
+            # Each PS3Dec names the decrypted file differently
+            decrypted_path = os.path.join(self.processing_dir, f"{base_name}.iso_decrypted.iso" if threaded else f"{base_name}.iso.dec")
+            if not os.path.exists(decrypted_path):
+                self.output_window.log(f"({queue_position}) Decryption failed for {base_name}, keeping the encrypted ISO.")
+            elif self.keep_enc_checkbox.isChecked():
+                # Keep the original as .iso.enc, os.replace also overwrites a leftover from an earlier run on Windows
+                os.replace(iso_path, enc_path)
+                os.replace(decrypted_path, iso_path)
+            else:
+                # Renaming over the encrypted ISO replaces it in one step, no .iso.enc to rename and delete
+                os.replace(decrypted_path, iso_path)
 
         # Split processed .iso file if splitting is enabled
-        if self.split_checkbox.isChecked() and os.path.getsize(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso")) >= 4294967295:
-            self.output_window.append(f"({queue_position}) Splitting ISO for {base_name}...")
-            split_iso_thread = SplitIsoThread(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso"))
+        if self.split_checkbox.isChecked() and os.path.getsize(iso_path) >= 4294967295:
+            self.output_window.log(f"({queue_position}) Splitting ISO for {base_name}...")
+            split_iso_thread = SplitIsoThread(iso_path, keep_original=self.keep_unsplit_dec_checkbox.isChecked())
             split_iso_thread.progress.connect(print)
-            split_iso_thread.start()
-            split_iso_thread.wait()  # Wait for the thread to finish
+            self.wait_for_thread(split_iso_thread)  # Wait for the thread to finish
 
             # Delete the unsplit iso if the checkbox is unchecked
-            if not self.keep_unsplit_dec_checkbox.isChecked() and os.path.exists(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso")):
-                os.remove(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso"))
+            if not self.keep_unsplit_dec_checkbox.isChecked() and os.path.exists(iso_path):
+                os.remove(iso_path)
 
         # Delete the .dkey file if the 'Keep dkey file' checkbox is unchecked
-        if not self.keep_dkey_checkbox.isChecked() and os.path.isfile(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.dkey")):
-            os.remove(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.dkey"))
+        if not self.keep_dkey_checkbox.isChecked() and os.path.isfile(dkey_path):
+            os.remove(dkey_path)
 
         # Move the finished file to the output directory
-        for file in glob.glob(os.path.join(self.processing_dir, base_name + '*')):
-            shutil.move(file, self.ps3iso_dir)
-
-        self.queue_list.takeItem(0)
-        self.output_window.append(f"({queue_position}) {base_name} complete!")
-
-        with open('queue.txt', 'wb') as file:
-            pickle.dump([self.queue_list.item(i).text() for i in range(self.queue_list.count())], file)
+        self.run_in_pool(move_files, [(file, os.path.join(self.ps3iso_dir, os.path.basename(file))) for file in list_files(self.processing_dir, base_name)])
 
-        # If there are more items in the queue, start the next download
-        if self.queue_list.count() > 0:
-            self.start_download()
+        self.output_window.log(f"({queue_position}) {base_name} complete!")
 
     def downloadps3psnzip(self, selected_iso, queue_position):
         url = "https://dl8.myrient.erista.me/files/No-Intro/Sony%20-%20PlayStation%203%20(PSN)%20(Content)"
         base_name = os.path.splitext(selected_iso)[0]
-        file_path = self.downloadhelper(selected_iso, queue_position, url)
-
-        if not file_path.lower().endswith('.zip'):
-            print(f"File {file_path} is not a .zip file. Skipping unzip.")
-            return
-
-        self.output_window.append(f"({queue_position}) Unzipping {base_name}.zip...")
-
-        # Unzip the ISO and delete the ZIP file
-        runner = UnzipRunner(file_path, self.processing_dir)
-        runner.progress_signal.connect(self.progress_bar.setValue)
-        runner.start()
-        loop = QEventLoop()
-        runner.finished.connect(loop.quit)
-        loop.exec_()
-        os.remove(file_path)
+        extracted_files = self.download_and_unzip(selected_iso, queue_position, url)
+        if extracted_files is None:
+            return False  # The download failed or was stopped, start_download keeps the item queued
 
         # Rename the extracted .pkg file to the original name of the zip file
-        for file in runner.extracted_files: 
+        new_file_path = os.path.join(self.processing_dir, f"{base_name}.pkg")
+        for file in extracted_files:
             if file.endswith('.pkg'):
-                new_file_path = os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}{os.path.splitext(file)[1]}")
-                os.rename(file, new_file_path)
+                os.replace(file, new_file_path)
                 if self.split_pkg_checkbox.isChecked():   # If the 'split PKG' checkbox is checked, split the PKG file
                     split_pkg_thread = SplitPkgThread(new_file_path)
                     split_pkg_thread.progress.connect(print)
-                    split_pkg_thread.start()
-                    split_pkg_thread.wait()
+                    self.wait_for_thread(split_pkg_thread)  # Wait for the thread to finish
 
         # Move the finished file to the output directory
-        for file in glob.glob(os.path.join(self.processing_dir, '*.rap')):
-            dst = os.path.join(self.psn_rap_dir, os.path.basename(file))
-            if os.path.exists(dst):
-                print(f"File {dst} already exists. Overwriting.")
-            shutil.move(file, dst)
-
-        for file in glob.glob(os.path.join(self.processing_dir, '*.pkg')) + glob.glob(os.path.join(self.processing_dir, '*.pkg.*')):
-            dst = os.path.join(self.psn_pkg_dir, os.path.basename(file))
+        files = list_files(self.processing_dir)
+        moves = [(file, os.path.join(self.psn_rap_dir, os.path.basename(file))) for file in files if file.endswith('.rap')]
+        moves += [(file, os.path.join(self.psn_pkg_dir, os.path.basename(file))) for file in files if file.endswith('.pkg') or '.pkg.' in os.path.basename(file)]
+        for file, dst in moves:
             if os.path.exists(dst):
                 print(f"File {dst} already exists. Overwriting.")
-            shutil.move(file, dst)
+        self.run_in_pool(move_files, moves)
 
 
-        self.queue_list.takeItem(0)
-        self.output_window.append(f"({queue_position}) {base_name} ready!")
-
-        with open('queue.txt', 'wb') as file:
-            pickle.dump([self.queue_list.item(i).text() for i in range(self.queue_list.count())], file)
-
-        # If there are more items in the queue, start the next download
-        if self.queue_list.count() > 0:
-            self.start_download()
+        self.output_window.log(f"({queue_position}) {base_name} ready!")
 
     def downloadps2isozip(self, selected_iso, queue_position):
         url = "https://myrient.erista.me/files/Redump/Sony - PlayStation 2"
         base_name = os.path.splitext(selected_iso)[0]
-        file_path = self.downloadhelper(selected_iso, queue_position, url)
+        extracted_files = self.download_and_unzip(selected_iso, queue_position, url)
+        if extracted_files is None:
+            return False  # The download failed or was stopped, start_download keeps the item queued
 
-        self.output_window.append(f"({queue_position}) Unzipping {base_name}.zip...")
-
-        # Unzip the ISO and delete the ZIP file
-        runner = UnzipRunner(file_path, self.processing_dir)
-        runner.progress_signal.connect(self.progress_bar.setValue)
-        runner.start()
-        loop = QEventLoop()
-        runner.finished.connect(loop.quit)
-        loop.exec_()
-
-        os.remove(file_path)
-
-        # Go through the extracted files
-        for file in runner.extracted_files:
+        # Go through the extracted files, collecting the moves to run together at the end
+        moves = []
+        for file in extracted_files:
             if file.endswith('.iso'):
                 if self.split_checkbox.isChecked() and os.path.getsize(file) >= 4294967295:
-                    self.output_window.append(f"({queue_position}) Splitting ISO for {base_name}...")
-                    split_iso_thread = SplitIsoThread(file)
+                    self.output_window.log(f"({queue_position}) Splitting ISO for {base_name}...")
+                    split_iso_thread = SplitIsoThread(file, keep_original=self.keep_unsplit_dec_checkbox.isChecked())
                     split_iso_thread.progress.connect(print)
-                    split_iso_thread.start()
-                    split_iso_thread.wait()  # Wait for the thread to finish
+                    self.wait_for_thread(split_iso_thread)  # Wait for the thread to finish
 
                     # Delete the unsplit iso if the checkbox is unchecked
                     if not self.keep_unsplit_dec_checkbox.isChecked() and os.path.exists(file):
                         os.remove(file)
 
-                    for split_file in glob.glob(file.rsplit('.', 1)[0] + '*.iso.*'):
-                        shutil.move(split_file, self.ps2iso_dir)
+                    for split_file in [part for part in list_files(self.processing_dir, os.path.basename(file.rsplit('.', 1)[0])) if '.iso.' in os.path.basename(part)]:
+                        moves.append((split_file, os.path.join(self.ps2iso_dir, os.path.basename(split_file))))
 
                 else:
                     # Move the iso to ps2iso_dir
-                    shutil.move(file, self.ps2iso_dir)
+                    moves.append((file, os.path.join(self.ps2iso_dir, os.path.basename(file))))
 
             # If the file is a .bin or .cue file, move it directly to ps2iso_dir
             elif file.endswith('.bin') or file.endswith('.cue'):
-                shutil.move(file, self.ps2iso_dir)
-
-        self.queue_list.takeItem(0)
-        self.output_window.append(f"({queue_position}) {base_name} complete!")
+                moves.append((file, os.path.join(self.ps2iso_dir, os.path.basename(file))))
 
-        with open('queue.txt', 'wb') as file:
-            pickle.dump([self.queue_list.item(i).text() for i in range(self.queue_list.count())], file)
+        self.run_in_pool(move_files, moves)
 
-        # If there are more items in the queue, start the next download
-        if self.queue_list.count() > 0:
-            self.start_download()
+        self.output_window.log(f"({queue_position}) {base_name} complete!")
 
     def downloadpsxzip(self, selected_iso, queue_position):
         url = "https://myrient.erista.me/files/Redump/Sony%20-%20PlayStation"
         base_name = os.path.splitext(selected_iso)[0]
-        file_path = self.downloadhelper(selected_iso, queue_position, url)
-
-        self.output_window.append(f"({queue_position}) Unzipping {base_name}.zip...")
-
-        # Unzip the ISO and delete the ZIP file
-        runner = UnzipRunner(file_path, self.processing_dir)
-        runner.progress_signal.connect(self.progress_bar.setValue)
-        runner.start()
-        loop = QEventLoop()
-        runner.finished.connect(loop.quit)
-        loop.exec_()
-
-        os.remove(file_path)
+        if self.download_and_unzip(selected_iso, queue_position, url) is None:
+            return False  # The download failed or was stopped, start_download keeps the item queued
 
         # Move the finished file to the output directory
-        for file in glob.glob(os.path.join(self.processing_dir, base_name + '*')):
-            shutil.move(file, self.psxiso_dir)
+        self.run_in_pool(move_files, [(file, os.path.join(self.psxiso_dir, os.path.basename(file))) for file in list_files(self.processing_dir, base_name)])
 
-        self.queue_list.takeItem(0)
-        self.output_window.append(f"({queue_position}) {base_name} complete!")
-
-        # If there are more items in the queue, start the next download
-        if self.queue_list.count() > 0:
-            self.start_download()
+        self.output_window.log(f"({queue_position}) {base_name} complete!")
 
     def downloadpspisozip(self, selected_iso, queue_position):
         url = "https://myrient.erista.me/files/Redump/Sony%20-%20PlayStation%20Portable"
         base_name = os.path.splitext(selected_iso)[0]
-        file_path = self.downloadhelper(selected_iso, queue_position, url)
-
-        self.output_window.append(f"({queue_position}) Unzipping {base_name}.zip...")
-
-        # Unzip the ISO and delete the ZIP file
-        runner = UnzipRunner(file_path, self.processing_dir)
-        runner.progress_signal.connect(self.progress_bar.setValue)
-        runner.start()
-        loop = QEventLoop()
-        runner.finished.connect(loop.quit)
-        loop.exec_()
-
-        os.remove(file_path)
+        iso_path = os.path.join(self.processing_dir, f"{base_name}.iso")
+        if self.download_and_unzip(selected_iso, queue_position, url) is None:
+            return False  # The download failed or was stopped, start_download keeps the item queued
 
         # Split processed .iso file if splitting is enabled
-        if self.split_checkbox.isChecked() and os.path.getsize(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso")) >= 4294967295:
-            self.output_window.append(f"({queue_position}) Splitting ISO for {base_name}...")
-            split_iso_thread = SplitIsoThread(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso"))
+        if self.split_checkbox.isChecked() and os.path.getsize(iso_path) >= 4294967295:
+            self.output_window.log(f"({queue_position}) Splitting ISO for {base_name}...")
+            split_iso_thread = SplitIsoThread(iso_path, keep_original=self.keep_unsplit_dec_checkbox.isChecked())
             split_iso_thread.progress.connect(print)
-            split_iso_thread.start()
-            split_iso_thread.wait()  # Wait for the thread to finish
+            self.wait_for_thread(split_iso_thread)  # Wait for the thread to finish
 
             # Delete the unsplit iso if the checkbox is unchecked
-            if not self.keep_unsplit_dec_checkbox.isChecked() and os.path.exists(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso")):
-                os.remove(os.path.join(self.processing_dir, f"{os.path.splitext(selected_iso)[0]}.iso"))
+            if not self.keep_unsplit_dec_checkbox.isChecked() and os.path.exists(iso_path):
+                os.remove(iso_path)
 
         # Move the finished file to the output directory
-        for file in glob.glob(os.path.join(self.processing_dir, base_name + '*')):
-            shutil.move(file, self.pspiso_dir)
-
-        self.queue_list.takeItem(0)
-        self.output_window.append(f"({queue_position}) {base_name} complete!")
-
-        with open('queue.txt', 'wb') as file:
-            pickle.dump([self.queue_list.item(i).text() for i in range(self.queue_list.count())], file)
+        self.run_in_pool(move_files, [(file, os.path.join(self.pspiso_dir, os.path.basename(file))) for file in list_files(self.processing_dir, base_name)])
 
-        # If there are more items in the queue, start the next download
-        if self.queue_list.count() > 0:
-            self.start_download()
+        self.output_window.log(f"({queue_position}) {base_name} complete!")
 
     def add_to_queue(self):
         selected_items = self.result_list.currentWidget().selectedItems()
+        # Build a set of the queued names once instead of rescanning the queue for every selected item
+        queued = {self.queue_list.item(i).text() for i in range(self.queue_list.count())}
+        new_items = []
         for item in selected_items:
             item_text = item.text()
-            if not any(item_text == self.queue_list.item(i).text() for i in range(self.queue_list.count())):
-                self.queue_list.addItem(item_text)
+            if item_text not in queued:
+                queued.add(item_text)
+                new_items.append(item_text)
 
-        # Save the queue to 'queue.txt'
-        with open('queue.txt', 'wb') as file:
-            pickle.dump([self.queue_list.item(i).text() for i in range(self.queue_list.count())], file)
+        # Add them in one batch so the list only repaints once
+        self.queue_list.setUpdatesEnabled(False)
+        self.queue_list.addItems(new_items)
+        self.queue_list.setUpdatesEnabled(True)
 
     def remove_from_queue(self):
         selected_items = self.queue_list.selectedItems()
@@ -957,10 +1587,14 @@ class GUIDownloader(QWidget):
             # Remove the item from the queue list
             self.queue_list.takeItem(self.queue_list.row(item))
 
-        # Save the queue to 'queue.txt'
-        with open('queue.txt', 'wb') as file:
-            pickle.dump([self.queue_list.item(i).text() for i in range(self.queue_list.count())], file)
+    def save_queue(self):
+        write_json_atomic('queue.txt', [self.queue_list.item(i).text() for i in range(self.queue_list.count())])
+        self.queue_save_timer.stop()
+        self.queue_dirty = False
 
+    def mark_queue_dirty(self, *args):
+        self.queue_dirty = True
+        self.queue_save_timer.start()  # Restart the debounce window
 
     def update_add_to_queue_button(self):
         self.add_to_queue_button.setEnabled(bool(self.result_list.currentWidget().selectedItems()))
@@ -973,56 +1607,84 @@ class GUIDownloader(QWidget):
         pass
 
     def update_results(self):
+        self.filter_list_widget(self.result_list.currentIndex())
+
+    def filter_list_widget(self, index):
         search_term = self.search_box.text().lower().split()
 
-        if self.result_list.currentIndex() == 0:
-            list_to_search = self.ps3iso_list
-        elif self.result_list.currentIndex() == 1:
-            list_to_search = self.psn_list
-        elif self.result_list.currentIndex() == 2:
-            list_to_search = self.ps2iso_list
-        elif self.result_list.currentIndex() == 3:
-            list_to_search = self.psxiso_list
+        # Match against the cached lowercased names instead of rebuilding the list widget on every keystroke
+        names = self.search_index[index]
+        previous_term = self.search_terms[index]
+        if previous_term is not None and all(any(old in new for new in search_term) for old in previous_term):
+            # The query only got narrower (e.g. another letter typed), so hidden rows stay hidden
+            # and only the rows that are still visible need checking
+            hidden_rows = self.hidden_rows[index] | {row for row in range(len(names)) if row not in self.hidden_rows[index] and not all(word in names[row] for word in search_term)}
+        elif search_term:
+            # Find the rarest-looking (longest) word with str.find over all names joined into one string, which runs in C,
+            # map each hit back to its row with bisect, and only check the other words on those rows
+            blob, row_starts = self.search_blobs[index]
+            longest = max(search_term, key=len)
+            visible_rows = set()
+            position = blob.find(longest)
+            while position != -1:
+                row = bisect.bisect_right(row_starts, position) - 1
+                if all(word in names[row] for word in search_term):
+                    visible_rows.add(row)
+                position = blob.find(longest, row_starts[row + 1] if row + 1 < len(row_starts) else len(blob))
+            hidden_rows = set(range(len(names))) - visible_rows
         else:
-            list_to_search = self.pspiso_list
-
-        filtered_list = [item for item in list_to_search if all(word in item.lower() for word in search_term)]
-
-        # Clear the current list widget and add the filtered items
-        current_list_widget = self.result_list.currentWidget()
-        current_list_widget.clear()
-        current_list_widget.addItems(filtered_list)
+            hidden_rows = set()
+        self.search_terms[index] = search_term
+
+        # setRowHidden is expensive, so only touch the rows whose visibility actually changes
+        list_widget = self.result_list.widget(index)
+        for row in hidden_rows ^ self.hidden_rows[index]:
+            list_widget.setRowHidden(row, row in hidden_rows)
+            if row in hidden_rows:
+                # Don't queue items the search has hidden, itemSelectionChanged updates the Add to Queue button
+                list_widget.item(row).setSelected(False)
+        self.hidden_rows[index] = hidden_rows
+
+    def populate_list_widget(self, index, software_list):
+        # Fill the list widget once and build its search index, searching then only hides rows
+        list_widget = self.result_list.widget(index)
+        # Repaint once when the new list is in place rather than while it's being built and filtered
+        list_widget.setUpdatesEnabled(False)
+        list_widget.clear()
+        list_widget.addItems(software_list)
+        self.search_index[index] = [name.lower() for name in software_list]
+        row_starts = list(itertools.accumulate((len(name) + 1 for name in self.search_index[index][:-1]), initial=0)) if software_list else []
+        self.search_blobs[index] = ('\n'.join(self.search_index[index]), row_starts)
+        self.hidden_rows[index] = set()
+        self.search_terms[index] = None
+        self.filter_list_widget(index)
+        list_widget.setUpdatesEnabled(True)
 
     def update_progress_bar(self, value):
         self.progress_bar.setValue(value)
 
     def set_ps3iso_list(self, ps3iso_list):
         self.ps3iso_list = ps3iso_list
-        self.result_list.widget(0).clear()
-        self.result_list.widget(0).addItems(self.ps3iso_list)
+        self.populate_list_widget(0, self.ps3iso_list)
 
     def set_psn_list(self, psn_list):
         self.psn_list = psn_list
-        self.result_list.widget(1).clear()
-        self.result_list.widget(1).addItems(self.psn_list)
+        self.populate_list_widget(1, self.psn_list)
 
     def set_ps2iso_list(self, ps2iso_list):
         self.ps2iso_list = ps2iso_list
-        self.result_list.widget(2).clear()
-        self.result_list.widget(2).addItems(self.ps2iso_list)
+        self.populate_list_widget(2, self.ps2iso_list)
 
     def set_psxiso_list(self, psxiso_list):
         self.psxiso_list = psxiso_list
-        self.result_list.widget(3).clear()
-        self.result_list.widget(3).addItems(self.psxiso_list)
+        self.populate_list_widget(3, self.psxiso_list)
 
     def set_pspiso_list(self, pspiso_list):
         self.pspiso_list = pspiso_list
-        self.result_list.widget(4).clear()
-        self.result_list.widget(4).addItems(self.pspiso_list)
+        self.populate_list_widget(4, self.pspiso_list)
 
     def append_to_output_window(self, text):
-        self.output_window.append(text)
+        self.output_window.log(text)
 
     def settings_welcome_dialog(self, title, close_button_text, add_iso_list_section=False, welcome_text=None):
         dialog = QDialog()
@@ -1078,6 +1740,17 @@ class GUIDownloader(QWidget):
         psn_rap_SelectButton.clicked.connect(lambda: self.open_directory_dialog(psn_rap_PathTextbox, 'psn_rap_dir'))
         select_location("PSN RAP Directory:", psn_rap_SelectButton, psn_rap_PathTextbox)
 
+        # Segmented downloads section
+        segmentedDownloadsCheckbox = QCheckBox('Download using 4 connections (faster, but some mirrors may rate limit)')
+        segmentedDownloadsCheckbox.setChecked(self.settings.value('segmented_downloads', False, type=bool))
+        segmentedDownloadsCheckbox.stateChanged.connect(lambda state: self.settings.setValue('segmented_downloads', bool(state)))
+        vbox.addWidget(segmentedDownloadsCheckbox)
+
+        streamUnzipCheckbox = QCheckBox('Unzip while downloading (halves disk usage, but interrupted downloads restart from the beginning)')
+        streamUnzipCheckbox.setChecked(self.settings.value('stream_unzip', False, type=bool))
+        streamUnzipCheckbox.stateChanged.connect(lambda state: self.settings.setValue('stream_unzip', bool(state)))
+        vbox.addWidget(streamUnzipCheckbox)
+
         # ISO List section
         if add_iso_list_section:
             iso_list_button = QPushButton('Update software lists')
@@ -1125,33 +1798,37 @@ class GUIDownloader(QWidget):
         self.settings_welcome_dialog("Welcome!", "Continue", welcome_text=welcome_text)
 
     def update_iso_list(self):
-        self.get_ps3iso_list_thread.start()
-        self.get_psn_list_thread.start()
-        self.get_ps2iso_list_thread.start()  
+        for thread in (self.ps3iso_thread, self.psn_thread, self.ps2iso_thread, self.psxiso_thread, self.pspiso_thread):
+            thread.refresh = True
+            thread.start()  # Does nothing if that list is still loading
 
     def is_valid_binary(self, path, binary_name):
-        # Check if the path is not empty, the file exists and the filename ends with the correct binary name
-        if path and os.path.isfile(path):
-            filename = os.path.basename(path)
-            if sys.platform == "win32":
-                # On Windows, check if the filename ends with .exe (case insensitive)
-                return filename.lower() == f"{binary_name}.exe"
-            else:
-                # On other platforms, just check the filename (case insensitive)
-                return filename.lower() == binary_name.lower()
-        return False
+        # Check the filename first, it needs no syscall, then that the path is a regular file with a single stat
+        if not path:
+            return False
+        # On Windows the filename has to end with .exe, elsewhere it is just the binary name (case insensitive either way)
+        expected = f"{binary_name}.exe" if sys.platform == "win32" else binary_name
+        if os.path.basename(path).lower() != expected.lower():
+            return False
+        try:
+            return stat.S_ISREG(os.stat(path).st_mode)
+        except OSError:
+            return False
 
     def download_ps3dec(self, ps3decButton, textbox):
-        urllib.request.urlretrieve("https://github.com/Redrrx/ps3dec/releases/download/0.1.0/ps3dec.exe", "ps3dec.exe")
+        # Download on the thread pool through the shared session, which retries transient GitHub errors
+        try:
+            self.run_in_pool(download_file, "https://github.com/Redrrx/ps3dec/releases/download/0.1.0/ps3dec.exe", "ps3dec.exe")
+        except (requests.RequestException, OSError) as e:
+            print(f"Could not download PS3Dec: {e}")
+            ps3decButton.setText('Download failed, try again')
+            return
         self.ps3dec_binary = os.path.join(os.getcwd(), "ps3dec.exe")
         self.settings.setValue('ps3dec_binary', self.ps3dec_binary)
 
         # Update the button
         ps3decButton.setText('PS3Dec downloaded! ✅')
         ps3decButton.setEnabled(False)
-
-        self.ps3dec_binary = './ps3dec' if sys.platform != "Windows" else './ps3dec.exe'
-        self.settings.setValue('ps3dec_binary', self.ps3dec_binary)
         textbox.setText(self.ps3dec_binary)
 
 if __name__ == '__main__':